@@ -1,18 +1,18 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
 from io import BytesIO
 import base64
-from pdf_creator import create_portfolio_pdf_report
+import hashlib
+import json
+import sys
 import numpy as np
 
 # Initialize session state for PDF
 if 'pdf_ready' not in st.session_state:
     st.session_state.pdf_ready = False
-if 'pdf_buffer' not in st.session_state:
-    st.session_state.pdf_buffer = None
+if 'pdf_data' not in st.session_state:
+    st.session_state.pdf_data = None
 
 # ==================== PAGE CONFIG ====================
 st.set_page_config(
@@ -111,10 +111,10 @@ def process_portfolio_data(df):
         'Current Price': 0
     })
     
-    # Convert to numeric
-    df['Quantity'] = pd.to_numeric(df['Quantity'], errors='coerce').fillna(0)
-    df['Buy Price'] = pd.to_numeric(df['Buy Price'], errors='coerce').fillna(0)
-    df['Current Price'] = pd.to_numeric(df['Current Price'], errors='coerce').fillna(0)
+    # Convert to numeric, skipping columns the reader already typed as numbers
+    for col in ('Quantity', 'Buy Price', 'Current Price'):
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
     
     # Calculate metrics
     df['Investment'] = df['Quantity'] * df['Buy Price']
@@ -123,53 +123,70 @@ def process_portfolio_data(df):
     df['Gain/Loss %'] = (df['Gain/Loss'] / df['Investment'].replace(0, 1)) * 100
     df['Weight %'] = (df['Current Value'] / df['Current Value'].sum()) * 100
     
+    # Categorical keys make the sector/cap groupbys run on integer codes
+    df['Sector'] = df['Sector'].astype('category')
+    df['Market Cap'] = df['Market Cap'].astype('category')
+    
     return df
 
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
+def load_and_process(file_bytes):
+    """Read and process uploaded Excel bytes, cached on file content"""
+    df = pd.read_excel(BytesIO(file_bytes), engine="calamine")
+    return process_portfolio_data(df)
+
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
+def compute_aggregates(df):
+    """Compute sector/cap totals and ranked holdings once per dataset"""
+    # Partial sort: select the 10 largest holdings in O(n), then order just those.
+    # Ties at the cut-off keep the earliest rows, matching nlargest(keep='first')
+    values = df['Current Value'].to_numpy()
+    k = min(10, len(values))
+    if k:
+        kth = np.partition(values, len(values) - k)[len(values) - k]
+        above = np.flatnonzero(values > kth)
+        ties = np.flatnonzero(values == kth)[:k - above.size]
+        top_idx = np.concatenate([above, ties])
+        top_idx = top_idx[np.lexsort((top_idx, -values[top_idx]))]
+    else:
+        top_idx = np.arange(0)
+    
+    return {
+        'sector_sums': df.groupby('Sector', sort=False, observed=True)['Current Value'].sum(),
+        'cap_sums': df.groupby('Market Cap', sort=False, observed=True)['Current Value'].sum(),
+        'top_by_value': df.iloc[top_idx],
+        'top_gainers': df.nlargest(5, 'Gain/Loss %'),
+        'top_losers': df.nsmallest(5, 'Gain/Loss %')
+    }
+
 # ... after process_portfolio_data function ...
 
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
 def prepare_pdf_data(df, total_investment, total_value, total_gain_loss, overall_return):
     """Prepare data for PDF generation"""
+    aggs = compute_aggregates(df)
+    sector_sums = aggs['sector_sums']
+    cap_sums = aggs['cap_sums']
     
     # Sector distribution
-    sector_dist = df.groupby('Sector')['Current Value'].sum().to_dict()
+    sector_dist = sector_sums.to_dict()
     
     # Market cap distribution
-    cap_dist = df.groupby('Market Cap')['Current Value'].sum().to_dict()
+    cap_dist = cap_sums.to_dict()
     
-    # Top holdings
-    top_holdings = []
-    top_df = df.nlargest(10, 'Current Value')
-    for _, row in top_df.iterrows():
-        top_holdings.append({
-            'name': row['Stock Name'],
-            'sector': row['Sector'],
-            'value': row['Current Value'],
-            'return_pct': row['Gain/Loss %']
-        })
+    # Top holdings (column order matches the PDF table)
+    top_df = aggs['top_by_value']
+    top_holdings = top_df[['Stock Name', 'Sector', 'Current Value', 'Gain/Loss %']]
     
     # Top gainers and losers
-    top_gainers = []
-    gainers_df = df.nlargest(3, 'Gain/Loss %')
-    for _, row in gainers_df.iterrows():
-        top_gainers.append({
-            'name': row['Stock Name'],
-            'return_pct': row['Gain/Loss %'],
-            'gain_loss': row['Gain/Loss']
-        })
-    
-    top_losers = []
-    losers_df = df.nsmallest(3, 'Gain/Loss %')
-    for _, row in losers_df.iterrows():
-        top_losers.append({
-            'name': row['Stock Name'],
-            'return_pct': row['Gain/Loss %'],
-            'gain_loss': row['Gain/Loss']
-        })
+    perf_cols = ['Stock Name', 'Gain/Loss %', 'Gain/Loss']
+    top_gainers = aggs['top_gainers'].head(3)[perf_cols]
+    top_losers = aggs['top_losers'].head(3)[perf_cols]
     
     # Risk metrics
-    top_5_concentration = df.nlargest(5, 'Current Value')['Weight %'].sum()
-    top_sector = df.groupby('Sector')['Current Value'].sum().idxmax()
-    top_sector_pct = (df.groupby('Sector')['Current Value'].sum().max() / total_value) * 100
+    top_5_concentration = top_df.head(5)['Weight %'].sum()
+    top_sector = sector_sums.idxmax()
+    top_sector_pct = (sector_dist[top_sector] / total_value) * 100
     
     pdf_data = {
         'total_investment': total_investment,
@@ -192,25 +209,56 @@ def prepare_pdf_data(df, total_investment, total_value, total_gain_loss, overall
     
     return pdf_data
 
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
+def build_pdf(pdf_data_key, _pdf_data):
+    """Build PDF report bytes, cached on a digest of the PDF data"""
+    from pdf_creator import create_portfolio_pdf_report
+    return create_portfolio_pdf_report(_pdf_data)
+
+def pdf_data_digest(pdf_data):
+    """Stable digest of PDF data used as the build_pdf cache key"""
+    payload = json.dumps(
+        pdf_data,
+        sort_keys=True,
+        default=lambda o: o.to_dict('split') if isinstance(o, pd.DataFrame) else str(o)
+    ).encode()
+    return hashlib.blake2b(payload).hexdigest()
+
 # ... then the main() function starts ...
 
 def create_pie_chart(data_dict, title, color_palette='Set3'):
     """Create a clean pie chart without percentage inside"""
+    # Plotting libraries are imported on first use to keep cold start fast
+    import matplotlib
+    if 'matplotlib.pyplot' not in sys.modules:
+        # Select the backend once, before pyplot is first imported
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.figure import Figure
+    import seaborn as sns
+    
     if not data_dict:
         return None
     
-    labels = list(data_dict.keys())
-    values = list(data_dict.values())
+    values_arr = np.asarray(list(data_dict.values()), dtype=float)
     
     # Filter out zero values
-    nonzero_indices = [i for i, v in enumerate(values) if v > 0]
-    labels = [labels[i] for i in nonzero_indices]
-    values = [values[i] for i in nonzero_indices]
+    mask = values_arr > 0
+    labels = np.asarray(list(data_dict.keys()), dtype=object)[mask]
+    values = values_arr[mask]
     
-    if not values:
+    if not values.size:
         return None
     
-    fig, ax = plt.subplots(figsize=(8, 6))
+    # Per-session pool of reusable chart figures, keyed by figsize
+    if 'fig_pool' not in st.session_state:
+        st.session_state.fig_pool = {}
+    figsize = (8, 6)
+    fig = st.session_state.fig_pool.get(figsize)
+    if fig is None:
+        fig = st.session_state.fig_pool[figsize] = Figure(figsize=figsize)
+    fig.clear()
+    ax = fig.add_subplot(111)
     
     # Use seaborn color palette
     if color_palette == 'Set3':
@@ -232,7 +280,7 @@ def create_pie_chart(data_dict, title, color_palette='Set3'):
     )
     
     # Add legend with percentages
-    percentages = [(v/sum(values))*100 for v in values]
+    percentages = values * (100.0 / values.sum())
     legend_labels = [f"{label} ({pct:.1f}%)" for label, pct in zip(labels, percentages)]
     
     # Position legend properly
@@ -249,7 +297,7 @@ def create_pie_chart(data_dict, title, color_palette='Set3'):
     ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
     ax.axis('equal')  # Equal aspect ratio ensures pie is drawn as circle
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 # ==================== MAIN APP ====================
@@ -293,8 +341,7 @@ def main():
     if uploaded_file is not None:
         try:
             # Read and process data
-            df = pd.read_excel(uploaded_file)
-            df = process_portfolio_data(df)
+            df = load_and_process(uploaded_file.getvalue())
             
             # Calculate portfolio metrics
             total_investment = df['Investment'].sum()
@@ -327,6 +374,8 @@ def main():
                     </div>
                     """, unsafe_allow_html=True)
             
+            aggs = compute_aggregates(df)
+            
             # Charts Section
             if generate_charts:
                 st.subheader("Portfolio Analysis")
@@ -335,19 +384,19 @@ def main():
                 
                 with col1:
                     # Sector Distribution
-                    sector_dist = df.groupby('Sector')['Current Value'].sum().to_dict()
+                    sector_dist = aggs['sector_sums'].to_dict()
                     if sector_dist:
                         fig = create_pie_chart(sector_dist, "Sector Distribution", 'Set3')
                         if fig:
-                            st.pyplot(fig)
+                            st.pyplot(fig, clear_figure=False)
                 
                 with col2:
                     # Market Cap Distribution
-                    cap_dist = df.groupby('Market Cap')['Current Value'].sum().to_dict()
+                    cap_dist = aggs['cap_sums'].to_dict()
                     if cap_dist:
                         fig = create_pie_chart(cap_dist, "Market Cap Distribution", 'viridis')
                         if fig:
-                            st.pyplot(fig)
+                            st.pyplot(fig, clear_figure=False)
             
             # Performance Highlights
             st.subheader("Performance Highlights")
@@ -356,7 +405,7 @@ def main():
             
             with col1:
                 st.markdown("**Top Gainers**")
-                top_gainers = df.nlargest(5, 'Gain/Loss %')
+                top_gainers = aggs['top_gainers']
                 for _, row in top_gainers.iterrows():
                     st.write(f"**{row['Stock Name']}**")
                     st.write(f"Return: {row['Gain/Loss %']:.1f}%")
@@ -365,7 +414,7 @@ def main():
             
             with col2:
                 st.markdown("**Top Losers**")
-                top_losers = df.nsmallest(5, 'Gain/Loss %')
+                top_losers = aggs['top_losers']
                 for _, row in top_losers.iterrows():
                     st.write(f"**{row['Stock Name']}**")
                     st.write(f"Return: {row['Gain/Loss %']:.1f}%")
@@ -397,26 +446,26 @@ def main():
                                 overall_return
                             )
                             
-                            # Generate PDF
-                            from pdf_creator import create_portfolio_pdf_report
-                            pdf_buffer = create_portfolio_pdf_report(pdf_data)
-                            
-                            # Store in session state
-                            st.session_state.pdf_buffer = pdf_buffer
+                            # Build once here so failures are reported; session state
+                            # keeps only the report data, not the PDF bytes
+                            build_pdf(pdf_data_digest(pdf_data), pdf_data)
+                            st.session_state.pdf_data = pdf_data
                             st.session_state.pdf_ready = True
                             
                             st.success("✅ PDF report generated successfully!")
-                            st.rerun()
                             
                         except Exception as e:
                             st.error(f"Error generating PDF: {str(e)}")
             
             # Show download button if PDF is ready
-            if st.session_state.get('pdf_ready', False) and st.session_state.get('pdf_buffer'):
+            if st.session_state.get('pdf_ready', False) and st.session_state.get('pdf_data'):
+                pdf_data = st.session_state.pdf_data
+                pdf_key = pdf_data_digest(pdf_data)
                 with col2:
+                    # build_pdf's cache is bounded, so an evicted report is rebuilt here
                     st.download_button(
                         label="📥 Download PDF Report",
-                        data=st.session_state.pdf_buffer,
+                        data=lambda: build_pdf(pdf_key, pdf_data),
                         file_name=f"portfolio_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
                         mime="application/pdf",
                         use_container_width=True
@@ -1,72 +1,78 @@
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.charts.legends import Legend
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from datetime import datetime
 from io import BytesIO
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
-import tempfile
+
+# Matches the seaborn 'Set3' palette used for the on-screen charts
+SET3_COLORS = [
+    '#8DD3C7', '#FFFFB3', '#BEBADA', '#FB8072', '#80B1D3', '#FDB462',
+    '#B3DE69', '#FCCDE5', '#D9D9D9', '#BC80BD', '#CCEBC5', '#FFED6F'
+]
 
 def create_pie_chart_for_pdf(data_dict, title):
-    """Create pie chart image for PDF"""
+    """Create native vector pie chart drawing for PDF"""
     if not data_dict:
         return None
     
-    labels = list(data_dict.keys())
-    values = list(data_dict.values())
+    values_arr = np.asarray(list(data_dict.values()), dtype=float)
     
     # Filter out zero values
-    nonzero_indices = [i for i, v in enumerate(values) if v > 0]
-    labels = [labels[i] for i in nonzero_indices]
-    values = [values[i] for i in nonzero_indices]
+    mask = values_arr > 0
+    labels = np.asarray(list(data_dict.keys()), dtype=object)[mask]
+    values = values_arr[mask]
     
-    if not values:
+    if not values.size:
         return None
     
-    # Create figure with specific size
-    fig, ax = plt.subplots(figsize=(4, 3), dpi=150)
-    
-    # Use Set3 palette
-    colors_list = sns.color_palette('Set3', len(labels))
-    
-    # Create pie chart
-    wedges, texts, autotexts = ax.pie(
-        values,
-        labels=None,
-        colors=colors_list,
-        startangle=90,
-        wedgeprops=dict(width=0.5, edgecolor='white', linewidth=0.5),
-        autopct='',
-        pctdistance=0.85
-    )
+    # Size the drawing to the legend: up to 20 rows per column, then wrap
+    legend_rows = min(values.size, 20)
+    legend_cols = -(-values.size // legend_rows)
+    drawing = Drawing(max(4*inch, 185 + 100 * legend_cols), max(3*inch, 45 + 9 * legend_rows))
+    top = drawing.height - 25
+    slice_colors = [colors.HexColor(SET3_COLORS[i % len(SET3_COLORS)]) for i in range(values.size)]
+    
+    # Donut chart, no labels inside
+    pie = Pie()
+    pie.x, pie.y = 15, top - 150
+    pie.width = pie.height = 150
+    pie.data = values.tolist()
+    pie.startAngle = 90
+    pie.direction = 'anticlockwise'
+    pie.innerRadiusFraction = 0.5
+    pie.slices.strokeColor = colors.white
+    pie.slices.strokeWidth = 0.5
+    for i, color in enumerate(slice_colors):
+        pie.slices[i].fillColor = color
+    drawing.add(pie)
     
     # Add legend
-    percentages = [(v/sum(values))*100 for v in values]
-    legend_labels = [f"{label[:15]} ({pct:.1f}%)" for label, pct in zip(labels, percentages)]
-    
-    ax.legend(
-        wedges,
-        legend_labels,
-        title=title[:20],
-        loc="center left",
-        bbox_to_anchor=(1, 0, 0.5, 1),
-        fontsize=6,
-        title_fontsize=7
-    )
-    
-    ax.set_title(title, fontsize=9, fontweight='bold', pad=10)
-    ax.axis('equal')
+    percentages = values * (100.0 / values.sum())
+    legend = Legend()
+    legend.x, legend.y = 185, top
+    legend.boxAnchor = 'nw'
+    legend.alignment = 'right'
+    legend.fontName = 'Helvetica'
+    legend.fontSize = 6
+    legend.dx = legend.dy = 6
+    legend.deltay = 9
+    legend.columnMaximum = legend_rows
+    legend.colorNamePairs = [
+        (color, f"{str(label)[:15]} ({pct:.1f}%)")
+        for color, label, pct in zip(slice_colors, labels, percentages)
+    ]
+    drawing.add(legend)
     
-    # Save to temporary file
-    temp_file = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-    plt.tight_layout()
-    plt.savefig(temp_file.name, dpi=150, bbox_inches='tight', transparent=False)
-    plt.close(fig)
+    drawing.add(String(pie.x + pie.width / 2, drawing.height - 16, title, fontName='Helvetica-Bold',
+                       fontSize=9, textAnchor='middle'))
     
-    return temp_file.name
+    return drawing
 
 def create_portfolio_pdf_report(portfolio_data):
     """Create professional PDF report without emojis"""
@@ -151,37 +157,33 @@ def create_portfolio_pdf_report(portfolio_data):
     # Add pie charts if available
     if portfolio_data.get('sector_chart'):
         content.append(Paragraph("Sector Distribution", section_style))
-        sector_chart_path = create_pie_chart_for_pdf(
+        sector_chart = create_pie_chart_for_pdf(
             portfolio_data['sector_distribution'],
             "Sector Distribution"
         )
-        if sector_chart_path:
-            sector_img = Image(sector_chart_path, width=4*inch, height=3*inch)
-            content.append(sector_img)
+        if sector_chart is not None:
+            content.append(sector_chart)
             content.append(Spacer(1, 10))
     
     if portfolio_data.get('market_cap_chart'):
         content.append(Paragraph("Market Cap Distribution", section_style))
-        cap_chart_path = create_pie_chart_for_pdf(
+        cap_chart = create_pie_chart_for_pdf(
             portfolio_data['market_cap_distribution'],
             "Market Cap Distribution"
         )
-        if cap_chart_path:
-            cap_img = Image(cap_chart_path, width=4*inch, height=3*inch)
-            content.append(cap_img)
+        if cap_chart is not None:
+            content.append(cap_chart)
             content.append(Spacer(1, 10))
     
     # Top Holdings
     content.append(Paragraph("Top 10 Holdings", section_style))
     
     holdings_data = [['Stock', 'Sector', 'Value (₹)', 'Return %']]
-    for holding in portfolio_data.get('top_holdings', [])[:10]:
-        holdings_data.append([
-            holding['name'][:20],
-            holding['sector'][:15],
-            f"₹{holding['value']:,.0f}",
-            f"{holding['return_pct']:.1f}%"
-        ])
+    holdings_data += [
+        [name[:20], sector[:15], f"₹{value:,.0f}", f"{return_pct:.1f}%"]
+        for name, sector, value, return_pct
+        in portfolio_data['top_holdings'].head(10).itertuples(index=False, name=None)
+    ]
     
     holdings_table = Table(holdings_data, colWidths=[90, 70, 80, 50])
     holdings_table.setStyle(TableStyle([
@@ -201,23 +203,13 @@ def create_portfolio_pdf_report(portfolio_data):
     
     perf_data = [['', 'Stock', 'Return %', 'Gain/Loss (₹)']]
     
-    # Top gainers
-    for gainer in portfolio_data.get('top_gainers', [])[:3]:
-        perf_data.append([
-            'Top Gainer',
-            gainer['name'][:15],
-            f"{gainer['return_pct']:.1f}%",
-            f"₹{gainer['gain_loss']:,.0f}"
-        ])
-    
-    # Top losers
-    for loser in portfolio_data.get('top_losers', [])[:3]:
-        perf_data.append([
-            'Top Loser',
-            loser['name'][:15],
-            f"{loser['return_pct']:.1f}%",
-            f"₹{loser['gain_loss']:,.0f}"
-        ])
+    # Top gainers and losers
+    for label, key in (('Top Gainer', 'top_gainers'), ('Top Loser', 'top_losers')):
+        perf_data += [
+            [label, name[:15], f"{return_pct:.1f}%", f"₹{gain_loss:,.0f}"]
+            for name, return_pct, gain_loss
+            in portfolio_data[key].head(3).itertuples(index=False, name=None)
+        ]
     
     perf_table = Table(perf_data, colWidths=[60, 80, 50, 80])
     perf_table.setStyle(TableStyle([
@@ -262,5 +254,4 @@ def create_portfolio_pdf_report(portfolio_data):
     
     # Build PDF
     doc.build(content)
-    buffer.seek(0)
-    return buffer
\ No newline at end of file
+    return buffer.getvalue()
\ No newline at end of file